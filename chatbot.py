@@ -1,5 +1,14 @@
 import os
 import json
+import sys
+import zlib
+import tempfile
+import time
+import random
+import cProfile
+import threading
+from contextlib import contextmanager
+from collections import Counter
 import streamlit as st
 from typing import List, Dict, Optional
 import chromadb
@@ -17,6 +26,193 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 EMBEDDING_MODEL = "text-embedding-3-small"
 CHAT_MODEL = "gpt-4o-mini"
 
+# Chat history: how many recent turns are rendered on each rerun, and how many
+# more are loaded on every click of "Încarcă mesaje mai vechi"
+HISTORY_WINDOW_TURNS = 10
+HISTORY_LOAD_STEP_TURNS = 10
+SUMMARY_HEADER = "**Rezumat detaliat:**\n\n"
+
+def env_number(name: str, default, cast=int):
+    """Citește un parametru numeric opțional din mediu; valorile invalide revin la default"""
+    try:
+        return cast(os.getenv(name, default))
+    except (TypeError, ValueError):
+        print(f"Valoare invalidă pentru {name}, folosesc {default}")
+        return default
+
+# Warm-up: precomputes answers for popular queries in the background at startup.
+# When POPULAR_QUERIES_FILE is set, every user query is appended to it (one per
+# line) and the WARMUP_TOP_N most frequent ones are precomputed alongside the
+# sidebar examples on the next start. The log is rotated to "<file>.1" once it
+# grows past QUERY_LOG_MAX_BYTES.
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+POPULAR_QUERIES_FILE = os.getenv("POPULAR_QUERIES_FILE")
+WARMUP_TOP_N = env_number("WARMUP_TOP_N", 5)
+QUERY_LOG_MAX_BYTES = env_number("QUERY_LOG_MAX_BYTES", 1_000_000)
+EXAMPLE_QUERIES = [
+    "Vreau o carte despre prietenie și magie",
+    "Ce recomanzi pentru cineva care iubește poveștile de război?",
+    "Aș vrea ceva despre aventură și curaj",
+    "Caut o carte distopică despre societate",
+    "Îmi place fantasy-ul epic cu prietenie",
+]
+
+# Profiling: PROFILE=1 profiles every request, PROFILE_SAMPLE_RATE profiles a
+# random fraction of them (0.0 - 1.0). Results are written to PROFILE_DIR, which
+# keeps at most PROFILE_MAX_FILES files (oldest profiles are removed first).
+# The Streamlit ?profile=1 URL flag is honoured only with PROFILE_ALLOW_QUERY_PARAM=1.
+PROFILE_ENABLED = os.getenv("PROFILE", "0") == "1"
+PROFILE_SAMPLE_RATE = env_number("PROFILE_SAMPLE_RATE", 0.0, float)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = env_number("PROFILE_MAX_FILES", 300)
+PROFILE_ALLOW_QUERY_PARAM = os.getenv("PROFILE_ALLOW_QUERY_PARAM", "0") == "1"
+PROFILE_FILE_SUFFIXES = (".prof", ".collapsed", ".spans.json")
+PROFILE_SAMPLE_INTERVAL = 0.005
+
+# =================== Request Profiler ===================
+class RequestProfiler:
+    """
+    Profilează o singură cerere: cProfile pentru timpul CPU, un thread care
+    eșantionează stiva (wall-clock, include așteptarea după I/O) și intervale
+    măsurate în jurul etapelor din get_recommendation.
+
+    Scrie în PROFILE_DIR fișierele <nume>.prof (cProfile / snakeviz),
+    <nume>.collapsed (flamegraph.pl, speedscope) și <nume>.spans.json.
+    """
+
+    _local = threading.local()
+    _write_lock = threading.Lock()
+
+    def __init__(self, name: str, output_dir: str = PROFILE_DIR):
+        self.name = name
+        self.output_dir = output_dir
+        self.spans = []
+        self._span_stack = []
+        self._samples = Counter()
+        self._profile = cProfile.Profile()
+        self._cprofile_active = False
+        self._stop = threading.Event()
+        self._target_thread = threading.get_ident()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+
+    @staticmethod
+    def should_profile(profile: Optional[bool] = None) -> bool:
+        """Flag explicit pe cerere, altfel PROFILE sau eșantionare aleatoare"""
+        if profile is not None:
+            return profile
+        if PROFILE_ENABLED:
+            return True
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    @classmethod
+    def current(cls):
+        """Profilerul cererii curente de pe acest thread, sau unul inactiv"""
+        return getattr(cls._local, "profiler", None) or NULL_PROFILER
+
+    @contextmanager
+    def span(self, name: str):
+        self._span_stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append({
+                "name": ";".join(self._span_stack),
+                "start_ms": round((start - self._started_at) * 1000, 3),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3)
+            })
+            self._span_stack.pop()
+
+    def event(self, name: str):
+        """Marchează un moment din cerere (fără durată), ex. un răspuns din cache"""
+        self.spans.append({
+            "name": ";".join(self._span_stack + [name]),
+            "start_ms": round((time.perf_counter() - self._started_at) * 1000, 3),
+            "duration_ms": 0.0,
+            "event": True
+        })
+
+    def _sample(self):
+        while not self._stop.wait(PROFILE_SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self._target_thread)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self._samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._started_at = time.perf_counter()
+        RequestProfiler._local.profiler = self
+        try:
+            self._profile.enable()
+            self._cprofile_active = True
+        except ValueError:
+            # Another request on a different thread already holds cProfile
+            pass
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+        if self._cprofile_active:
+            self._profile.disable()
+        RequestProfiler._local.profiler = None
+        try:
+            self._write()
+        except OSError as e:
+            # Profiling must never fail the request it observes
+            print(f"Nu am putut salva profilul {self.name} în {self.output_dir}: {e}")
+
+    def _prune(self, incoming: int):
+        """Șterge cele mai vechi profiluri ca să rămână loc pentru `incoming` fișiere"""
+        paths = [
+            os.path.join(self.output_dir, name)
+            for name in os.listdir(self.output_dir)
+            if name.endswith(PROFILE_FILE_SUFFIXES)
+        ]
+        excess = len(paths) + incoming - PROFILE_MAX_FILES
+        if excess <= 0:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:excess]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _write(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        with RequestProfiler._write_lock:
+            self._prune(len(PROFILE_FILE_SUFFIXES))
+            self._write_files()
+
+    def _write_files(self):
+        base = os.path.join(self.output_dir, self.name)
+        if self._cprofile_active:
+            self._profile.dump_stats(base + ".prof")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            for stack, count in self._samples.items():
+                f.write(f"{stack} {count}\n")
+        with open(base + ".spans.json", "w", encoding="utf-8") as f:
+            json.dump(self.spans, f, ensure_ascii=False, indent=2)
+
+
+class _NullProfiler:
+    """Înlocuitor fără cost când profilarea este dezactivată"""
+
+    @contextmanager
+    def span(self, name: str):
+        yield
+
+    def event(self, name: str):
+        pass
+
+
+NULL_PROFILER = _NullProfiler()
+
 # =================== Profanity Filter ===================
 class ProfanityFilter:
     def __init__(self):
@@ -100,7 +296,6 @@ class ProfanityFilter:
             "Am observat că mesajul tău conține expresii nepotrivite. Hai să ne concentrăm pe găsirea unei cărți perfecte pentru tine!"
         ]
         
-        import random
         return random.choice(responses)
 
 # =================== Book Database ===================
@@ -396,19 +591,22 @@ class BookRAG:
     
     def search_books(self, query: str, n_results: int = 3) -> List[Dict]:
         """Search for books based on semantic similarity"""
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
+        profiler = RequestProfiler.current()
+        with profiler.span("chroma_query"):
+            results = self.collection.query(
+                query_texts=[query],
+                n_results=n_results
+            )
         
-        books = []
-        for i in range(len(results['ids'][0])):
-            books.append({
-                "title": results['metadatas'][0][i]['title'],
-                "themes": results['metadatas'][0][i]['themes'],
-                "document": results['documents'][0][i],
-                "distance": results['distances'][0][i] if 'distances' in results else None
-            })
+        with profiler.span("reshape_results"):
+            books = []
+            for i in range(len(results['ids'][0])):
+                books.append({
+                    "title": results['metadatas'][0][i]['title'],
+                    "themes": results['metadatas'][0][i]['themes'],
+                    "document": results['documents'][0][i],
+                    "distance": results['distances'][0][i] if 'distances' in results else None
+                })
         
         return books
 
@@ -451,43 +649,173 @@ tool_definition = {
     }
 }
 
+# =================== Popular Queries ===================
+def normalize_query(query: str) -> str:
+    """Normalizează o întrebare pentru căutarea în răspunsurile precalculate"""
+    return " ".join(query.lower().split()).strip(' "\'.!?')
+
+_query_log_lock = threading.Lock()
+
+def log_query(query: str):
+    """Adaugă întrebarea în POPULAR_QUERIES_FILE, dacă este configurat"""
+    if not POPULAR_QUERIES_FILE:
+        return
+    line = " ".join(query.split())
+    try:
+        with _query_log_lock:
+            if (os.path.exists(POPULAR_QUERIES_FILE)
+                    and os.path.getsize(POPULAR_QUERIES_FILE) >= QUERY_LOG_MAX_BYTES):
+                os.replace(POPULAR_QUERIES_FILE, POPULAR_QUERIES_FILE + ".1")
+            with open(POPULAR_QUERIES_FILE, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        print(f"Nu am putut salva întrebarea în {POPULAR_QUERIES_FILE}: {e}")
+
+def load_popular_queries(top_n: int = WARMUP_TOP_N) -> List[str]:
+    """
+    Returnează exemplele din sidebar plus cele mai frecvente `top_n` întrebări
+    din logul POPULAR_QUERIES_FILE (fișierul curent și cel rotit), fără
+    duplicate. Variantele aceleiași întrebări sunt numărate împreună.
+    """
+    queries = list(EXAMPLE_QUERIES)
+    seen = {normalize_query(query) for query in queries}
+    if not POPULAR_QUERIES_FILE:
+        return queries
+
+    counts = Counter()
+    originals = {}
+    for path in (POPULAR_QUERIES_FILE + ".1", POPULAR_QUERIES_FILE):
+        if not os.path.exists(path):
+            continue
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                key = normalize_query(line)
+                if key and key not in seen:
+                    counts[key] += 1
+                    originals.setdefault(key, line.strip())
+
+    queries.extend(originals[key] for key, _ in counts.most_common(top_n))
+    return queries
+
 # =================== Chatbot Class ===================
 class BookRecommendationChatbot:
     def __init__(self):
-        """Initialize the chatbot with RAG, OpenAI client, and profanity filter"""
-        self.rag = BookRAG()
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        """
+        Initialize the chatbot with the profanity filter. RAG and the OpenAI
+        client are built lazily, by the warm-up thread or the first request.
+        """
+        self.rag = None
+        self.client = None
+        self._components_lock = threading.Lock()
         self.profanity_filter = ProfanityFilter()
         self.conversation_history = []
+        self.precomputed_answers = {}
+        self.warmup_status = {"state": "idle", "done": 0, "total": 0, "error": None, "failed_queries": {}}
+    
+    def _ensure_components(self):
+        """Construiește ChromaDB și clientul OpenAI o singură dată; cererile așteaptă aici"""
+        with self._components_lock:
+            if self.rag is None:
+                self.client = OpenAI(api_key=OPENAI_API_KEY)
+                self.rag = BookRAG()
+    
+    def warm_up(self, queries: List[str]):
+        """
+        Încălzește calea de răspuns: creează colecția ChromaDB, deschide
+        conexiunile către OpenAI, face primul apel de embedding și
+        precalculează răspunsurile pentru întrebările populare.
+        """
+        self.warmup_status.update(state="running", done=0, total=len(queries), error=None, failed_queries={})
+        try:
+            # Collection creation + first embedding call, independent of the queries
+            self._ensure_components()
+            self.rag.search_books("carte", n_results=1)
+        except Exception as e:
+            self.warmup_status.update(state="failed", error=str(e))
+            return
         
-    def get_recommendation(self, user_query: str) -> str:
+        # A failing popular query is recorded and skipped; it will be answered live
+        for query in queries:
+            if self.profanity_filter.contains_profanity(query):
+                continue
+            try:
+                answer = self.get_recommendation(query, profile=False)
+            except Exception as e:
+                self.warmup_status["failed_queries"][query] = str(e)
+                continue
+            self.precomputed_answers[normalize_query(query)] = answer
+            self.warmup_status["done"] += 1
+        self.warmup_status["state"] = "ready"
+    
+    def start_warm_up(self, queries: Optional[List[str]] = None) -> threading.Thread:
+        """Pornește warm-up-ul pe un thread de fundal"""
+        if queries is None:
+            queries = load_popular_queries()
+        thread = threading.Thread(target=self.warm_up, args=(queries,), daemon=True)
+        thread.start()
+        return thread
+    
+    def is_ready(self) -> bool:
+        return self.warmup_status["state"] == "ready"
+        
+    def get_recommendation(self, user_query: str, profile: Optional[bool] = None) -> str:
         """
         Get book recommendation based on user query
         
         Args:
             user_query: User's question about books
+            profile: Force profiling on/off for this request; by default
+                PROFILE / PROFILE_SAMPLE_RATE decide
             
         Returns:
             AI response with book recommendation and detailed summary,
             or polite response if profanity detected
         """
+        if not RequestProfiler.should_profile(profile):
+            return self._get_recommendation(user_query)
+        
+        name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{threading.get_ident()}"
+        profiler = RequestProfiler(name)
+        profiler.start()
+        try:
+            with profiler.span("get_recommendation"):
+                return self._get_recommendation(user_query)
+        finally:
+            profiler.stop()
+    
+    def _get_recommendation(self, user_query: str) -> str:
+        profiler = RequestProfiler.current()
+        
         # Check for profanity first
-        if self.profanity_filter.contains_profanity(user_query):
-            return self.profanity_filter.get_polite_response()
+        with profiler.span("profanity_check"):
+            if self.profanity_filter.contains_profanity(user_query):
+                return self.profanity_filter.get_polite_response()
+        
+        # Popular queries are answered from the warm-up cache
+        with profiler.span("precomputed_lookup"):
+            precomputed = self.precomputed_answers.get(normalize_query(user_query))
+        if precomputed is not None:
+            profiler.event("precomputed_hit")
+            return precomputed
         
         # If clean, proceed with normal recommendation flow
-        # Search for relevant books using RAG
-        relevant_books = self.rag.search_books(user_query, n_results=3)
+        # (waits for the warm-up thread if it is still building the index)
+        self._ensure_components()
         
-        # Prepare context for GPT
-        context = "Cărți relevante găsite în baza de date:\n\n"
-        for book in relevant_books:
-            context += f"Titlu: {book['title']}\n"
-            context += f"Teme: {book['themes']}\n"
-            context += f"Despre: {book['document']}\n\n"
+        # Search for relevant books using RAG
+        with profiler.span("search_books"):
+            relevant_books = self.rag.search_books(user_query, n_results=3)
         
-        # System prompt
-        system_prompt = """Ești un bibliotecar AI prietenos și cunoscător care recomandă cărți. 
+        with profiler.span("context_assembly"):
+            # Prepare context for GPT
+            context = "Cărți relevante găsite în baza de date:\n\n"
+            for book in relevant_books:
+                context += f"Titlu: {book['title']}\n"
+                context += f"Teme: {book['themes']}\n"
+                context += f"Despre: {book['document']}\n\n"
+            
+            # System prompt
+            system_prompt = """Ești un bibliotecar AI prietenos și cunoscător care recomandă cărți. 
         Folosește informațiile din contextul oferit pentru a recomanda cea mai potrivită carte.
         
         Instrucțiuni:
@@ -500,41 +828,43 @@ class BookRecommendationChatbot:
         
         Context cu cărți disponibile:
         """ + context
-        
-        # Create messages for chat
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_query}
-        ]
+            
+            # Create messages for chat
+            messages = [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_query}
+            ]
         
         # First API call - get recommendation
-        response = self.client.chat.completions.create(
-            model=CHAT_MODEL,
-            messages=messages,
-            tools=[tool_definition],
-            tool_choice="auto",
-            temperature=0.7
-        )
+        with profiler.span("chat_completion"):
+            response = self.client.chat.completions.create(
+                model=CHAT_MODEL,
+                messages=messages,
+                tools=[tool_definition],
+                tool_choice="auto",
+                temperature=0.7
+            )
         
         # Process response
         message = response.choices[0].message
         
         # Check if function was called
         if message.tool_calls:
-            # Get the function call
-            tool_call = message.tool_calls[0]
-            function_args = json.loads(tool_call.function.arguments)
-            
-            # Execute the function
-            book_title = function_args.get("title", "")
-            detailed_summary = get_summary_by_title(book_title)
+            with profiler.span("tool_call"):
+                # Get the function call
+                tool_call = message.tool_calls[0]
+                function_args = json.loads(tool_call.function.arguments)
+                
+                # Execute the function
+                book_title = function_args.get("title", "")
+                detailed_summary = get_summary_by_title(book_title)
             
             # Prepare the complete response
             initial_response = message.content if message.content else ""
             
             # Format the final response
             final_response = f"{initial_response}\n\n"
-            final_response += "**Rezumat detaliat:**\n\n"
+            final_response += SUMMARY_HEADER
             final_response += f"{detailed_summary}"
             
             return final_response
@@ -544,30 +874,135 @@ class BookRecommendationChatbot:
             messages.append({"role": "user", "content": "Te rog folosește funcția get_summary_by_title pentru a oferi rezumatul detaliat al cărții recomandate."})
             
             # Retry with explicit instruction
-            retry_response = self.client.chat.completions.create(
-                model=CHAT_MODEL,
-                messages=messages,
-                tools=[tool_definition],
-                tool_choice={"type": "function", "function": {"name": "get_summary_by_title"}},
-                temperature=0.7
-            )
+            with profiler.span("retry_completion"):
+                retry_response = self.client.chat.completions.create(
+                    model=CHAT_MODEL,
+                    messages=messages,
+                    tools=[tool_definition],
+                    tool_choice={"type": "function", "function": {"name": "get_summary_by_title"}},
+                    temperature=0.7
+                )
             
             retry_message = retry_response.choices[0].message
             if retry_message.tool_calls:
-                tool_call = retry_message.tool_calls[0]
-                function_args = json.loads(tool_call.function.arguments)
-                book_title = function_args.get("title", "")
-                detailed_summary = get_summary_by_title(book_title)
+                with profiler.span("tool_call"):
+                    tool_call = retry_message.tool_calls[0]
+                    function_args = json.loads(tool_call.function.arguments)
+                    book_title = function_args.get("title", "")
+                    detailed_summary = get_summary_by_title(book_title)
                 
                 final_response = f"{message.content}\n\n"
-                final_response += "**Rezumat detaliat:**\n\n"
+                final_response += SUMMARY_HEADER
                 final_response += f"{detailed_summary}"
                 
                 return final_response
             
             return message.content
 
+# =================== Chat History ===================
+class ChatHistory:
+    """
+    Istoricul conversației dintr-o sesiune Streamlit, stocat compact.
+
+    Istoricul este păstrat pe ture (întrebare + răspuns opțional), așa că o
+    întrebare rămasă fără răspuns nu decalează fereastra. Doar fereastra
+    recentă stă în memorie. Turele mai vechi sunt mutate pe disc în blocuri
+    comprimate cu zlib și citite doar când sunt cerute, astfel că memoria
+    sesiunii nu crește odată cu numărul de ture. Rezumatele detaliate din
+    catalog sunt păstrate doar ca referință la titlu.
+    """
+
+    def __init__(self, window_turns: int = HISTORY_WINDOW_TURNS):
+        self.window_turns = window_turns
+        self._block_size = window_turns
+        self._recent = []
+        self._block_count = 0
+        self._spill_dir = None
+
+    @property
+    def turn_count(self) -> int:
+        """Numărul de ture (întrebare + răspuns) din istoric"""
+        return self._block_count * self._block_size + len(self._recent)
+
+    def add(self, role: str, content: str):
+        """Adaugă un mesaj, înlocuind rezumatul din catalog cu o referință la titlu"""
+        if role == "user":
+            # [întrebare, răspuns, titlul rezumatului din catalog]
+            self._recent.append([content, None, None])
+            if len(self._recent) >= self.window_turns + self._block_size:
+                self._spill_block()
+            return
+
+        summary_title = None
+        if SUMMARY_HEADER in content:
+            for title, summary in book_summaries_detailed.items():
+                if content.endswith(SUMMARY_HEADER + summary):
+                    content = content[:-len(SUMMARY_HEADER + summary)]
+                    summary_title = title
+                    break
+
+        if self._recent and self._recent[-1][1] is None:
+            self._recent[-1][1:] = [content, summary_title]
+        else:
+            # Answer without a pending question, kept as a turn of its own
+            self._recent.append([None, content, summary_title])
+
+    def _block_path(self, index: int) -> str:
+        return os.path.join(self._spill_dir.name, f"{index}.json.z")
+
+    def _spill_block(self):
+        """Mută cel mai vechi bloc de ture din memorie pe disc, comprimat"""
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.TemporaryDirectory(prefix="chat_history_")
+        block = self._recent[:self._block_size]
+        with open(self._block_path(self._block_count), "wb") as f:
+            f.write(zlib.compress(json.dumps(block, ensure_ascii=False).encode("utf-8")))
+        self._block_count += 1
+        del self._recent[:self._block_size]
+
+    def _load_block(self, index: int) -> List[list]:
+        with open(self._block_path(index), "rb") as f:
+            return json.loads(zlib.decompress(f.read()))
+
+    def recent(self, turns: int) -> List[Dict]:
+        """Returnează mesajele din ultimele `turns` ture, cu textul complet reconstruit"""
+        needed = min(turns, self.turn_count)
+        entries = list(self._recent)
+        index = self._block_count - 1
+        while len(entries) < needed:
+            entries = self._load_block(index) + entries
+            index -= 1
+
+        messages = []
+        for question, answer, summary_title in entries[len(entries) - needed:]:
+            if question is not None:
+                messages.append({"role": "user", "content": question})
+            if answer is not None:
+                if summary_title:
+                    answer += SUMMARY_HEADER + book_summaries_detailed[summary_title]
+                messages.append({"role": "assistant", "content": answer})
+        return messages
+
+    def clear(self):
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+        self._spill_dir = None
+        self._recent = []
+        self._block_count = 0
+
 # =================== Streamlit UI ===================
+@st.cache_resource
+def get_shared_chatbot() -> BookRecommendationChatbot:
+    """
+    Chatbot comun tuturor sesiunilor. Crearea lui este ieftină: colecția
+    ChromaDB și warm-up-ul sunt construite pe thread-ul de fundal, deci
+    prima încărcare a paginii nu așteaptă după ele.
+    """
+    chatbot = BookRecommendationChatbot()
+    if WARMUP_ENABLED:
+        chatbot.start_warm_up()
+    return chatbot
+
 def main():
     st.set_page_config(
         page_title="Book Recommendation Chatbot",
@@ -595,13 +1030,19 @@ def main():
             st.write(f"• {book['title']}")
         
         st.header("Exemple de întrebări")
-        st.markdown("""
-        - "Vreau o carte despre prietenie și magie"
-        - "Ce recomanzi pentru cineva care iubește poveștile de război?"
-        - "Aș vrea ceva despre aventură și curaj"
-        - "Caut o carte distopică despre societate"
-        - "Îmi place fantasy-ul epic cu prietenie"
-        """)
+        st.markdown("\n".join(f'- "{query}"' for query in EXAMPLE_QUERIES))
+        
+        shared_chatbot = get_shared_chatbot()
+        status = shared_chatbot.warmup_status
+        if shared_chatbot.is_ready():
+            caption = f"Gata: {status['done']} răspunsuri populare precalculate"
+            if status["failed_queries"]:
+                caption += f" ({len(status['failed_queries'])} eșuate)"
+            st.caption(caption)
+        elif status["state"] == "running":
+            st.caption(f"Pregătesc răspunsurile populare... {status['done']}/{status['total']}")
+        elif status["state"] == "failed":
+            st.caption(f"Warm-up eșuat: {status['error']}")
         
         st.header("Reguli de utilizare")
         st.markdown("""
@@ -611,20 +1052,34 @@ def main():
     
     # Initialize session state
     if 'chatbot' not in st.session_state:
-        st.session_state.chatbot = BookRecommendationChatbot()
+        st.session_state.chatbot = get_shared_chatbot()
     
-    if 'messages' not in st.session_state:
-        st.session_state.messages = []
+    if 'history' not in st.session_state:
+        st.session_state.history = ChatHistory()
     
-    # Display chat history
-    for message in st.session_state.messages:
+    if 'visible_turns' not in st.session_state:
+        st.session_state.visible_turns = HISTORY_WINDOW_TURNS
+    
+    history = st.session_state.history
+    
+    # Older turns are only rendered on demand
+    hidden_turns = history.turn_count - st.session_state.visible_turns
+    if hidden_turns > 0:
+        if st.button(f"Încarcă mesaje mai vechi ({hidden_turns} ascunse)"):
+            st.session_state.visible_turns += HISTORY_LOAD_STEP_TURNS
+            st.rerun()
+    
+    # Display chat history (only the visible window)
+    for message in history.recent(st.session_state.visible_turns):
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
     
     # Chat input
     if prompt := st.chat_input("Întreabă-mă despre ce fel de carte cauți..."):
         # Add user message
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        history.add("user", prompt)
+        if not st.session_state.chatbot.profanity_filter.contains_profanity(prompt):
+            log_query(prompt)
         with st.chat_message("user"):
             st.markdown(prompt)
         
@@ -632,21 +1087,26 @@ def main():
         with st.chat_message("assistant"):
             with st.spinner("Caut cea mai bună recomandare pentru tine..."):
                 try:
-                    response = st.session_state.chatbot.get_recommendation(prompt)
+                    # ?profile=1 in the URL profiles the request, if the operator allows it
+                    profile = None
+                    if PROFILE_ALLOW_QUERY_PARAM and st.query_params.get("profile") == "1":
+                        profile = True
+                    response = st.session_state.chatbot.get_recommendation(prompt, profile=profile)
                     st.markdown(response)
-                    st.session_state.messages.append({"role": "assistant", "content": response})
+                    history.add("assistant", response)
                 except Exception as e:
                     error_msg = f"A apărut o eroare: {str(e)}"
                     st.error(error_msg)
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                    history.add("assistant", error_msg)
     
     # Clear conversation button
     if st.button("Șterge conversația"):
-        st.session_state.messages = []
+        history.clear()
+        st.session_state.visible_turns = HISTORY_WINDOW_TURNS
         st.rerun()
 
 # =================== CLI Alternative ===================
-def cli_main():
+def cli_main(profile: Optional[bool] = None):
     """Command Line Interface for the chatbot"""
     print("="*60)
     print("CHATBOT PENTRU RECOMANDĂRI DE CĂRȚI")
@@ -656,6 +1116,9 @@ def cli_main():
     print("(Scrie 'exit' pentru a ieși)\n")
     
     chatbot = BookRecommendationChatbot()
+    if WARMUP_ENABLED:
+        chatbot.start_warm_up()
+    warmup_failure_reported = False
     
     while True:
         user_input = input("\nTu: ").strip()
@@ -672,19 +1135,98 @@ def cli_main():
             print("\nChatbot:", chatbot.profanity_filter.get_polite_response())
             continue
         
+        log_query(user_input)
+        
+        status = chatbot.warmup_status
+        if status["state"] == "failed" and not warmup_failure_reported:
+            print(f"\n(Warm-up eșuat: {status['error']})")
+            warmup_failure_reported = True
+        
         print("\nChatbot: ", end="")
-        print("(caut cea mai bună recomandare...)\n")
+        if status["state"] == "running":
+            print("(încă mă pregătesc, primul răspuns poate dura mai mult...)\n")
+        else:
+            print("(caut cea mai bună recomandare...)\n")
         
         try:
-            response = chatbot.get_recommendation(user_input)
+            response = chatbot.get_recommendation(user_input, profile=profile)
             print(response)
         except Exception as e:
             print(f"\nEroare: {str(e)}")
             print("Te rog verifică API key-ul OpenAI și încearcă din nou.")
 
+# =================== History Benchmark ===================
+def bench_history(turn_counts: Optional[List[int]] = None, repeats: int = 5):
+    """
+    Compară istoricul simplu (listă de mesaje) cu ChatHistory: durata unui
+    rerun Streamlit real (st.chat_message + st.markdown, prin AppTest) și
+    memoria ocupată de istoric în session_state.
+    """
+    import tracemalloc
+    from streamlit.testing.v1 import AppTest
+
+    turn_counts = turn_counts or [10, 50, 100, 250, 500, 1000]
+    title = book_summaries_short[0]["title"]
+
+    def answer(i):
+        return (
+            f"({i}) Îți recomand '{title}', o carte care se potrivește perfect cu ce cauți.\n\n"
+            + SUMMARY_HEADER + book_summaries_detailed[title]
+        )
+
+    def build_plain(turns):
+        messages = []
+        for i in range(turns):
+            messages.append({"role": "user", "content": f"Întrebarea {i} despre cărți"})
+            messages.append({"role": "assistant", "content": answer(i)})
+        return messages
+
+    def build_windowed(turns):
+        history = ChatHistory()
+        for i in range(turns):
+            history.add("user", f"Întrebarea {i} despre cărți")
+            history.add("assistant", answer(i))
+        return history
+
+    def render_plain():
+        import streamlit as st
+        for message in st.session_state.history:
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+
+    def render_windowed():
+        import streamlit as st
+        for message in st.session_state.history.recent(st.session_state.visible_turns):
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+
+    def measure(build, render, turns):
+        tracemalloc.start()
+        history = build(turns)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        app = AppTest.from_function(render)
+        app.session_state["history"] = history
+        app.session_state["visible_turns"] = HISTORY_WINDOW_TURNS
+        app.run()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            app.run()
+        rerun_ms = (time.perf_counter() - start) * 1000 / repeats
+        return rerun_ms, memory / 1024
+
+    print(f"{'ture':>6} | {'listă ms':>9} {'listă KiB':>10} | {'fereastră ms':>12} {'fereastră KiB':>13}")
+    for turns in turn_counts:
+        plain = measure(build_plain, render_plain, turns)
+        windowed = measure(build_windowed, render_windowed, turns)
+        print(f"{turns:>6} | {plain[0]:>9.1f} {plain[1]:>10.1f} | {windowed[0]:>12.1f} {windowed[1]:>13.1f}")
+
 # =================== Entry Point ===================
 if __name__ == "__main__":
-    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "--bench-history":
+        bench_history()
+        sys.exit(0)
     
     # Check for API key
     if not OPENAI_API_KEY:
@@ -694,7 +1236,7 @@ if __name__ == "__main__":
     
     # Check command line arguments
     if len(sys.argv) > 1 and sys.argv[1] == "--cli":
-        cli_main()
+        cli_main(profile=True if "--profile" in sys.argv else None)
     else:
         print("Pornesc interfața Streamlit...")
         print("Pentru versiunea CLI, rulează: python app.py --cli")